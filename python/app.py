@@ -10,13 +10,21 @@ import subprocess
 import hashlib
 from io import StringIO
 import csv
-from datetime import datetime, timezone
+import time
+from datetime import datetime, timedelta
 
 
 base_path = pathlib.Path(__file__).resolve().parent.parent
 static_folder = base_path / 'static'
 icons_folder = base_path / 'public' / 'icons'
 RANKS = ["S", "A", "B", "C"]
+EPOCH = datetime(1970, 1, 1)
+
+# reserved_at / canceled_at (UTC) as epoch microseconds, added in /initialize
+RESERVATION_EPOCH_COLUMNS = [
+    ('reserved_at_us', 'reserved_at'),
+    ('canceled_at_us', 'canceled_at'),
+]
 
 
 class CustomFlask(flask.Flask):
@@ -150,7 +158,7 @@ def get_event(event_id, login_user_id=None, need_detail=True, only_public=False)
             event['sheets'][rank]['detail'] = []
 
         sql = '''
-        SELECT sheet_id, user_id, reserved_at
+        SELECT sheet_id, user_id, reserved_at_us
         FROM reservations
         WHERE event_id = %s AND canceled_at IS NULL
         ORDER BY sheet_id
@@ -180,7 +188,7 @@ def get_event(event_id, login_user_id=None, need_detail=True, only_public=False)
             if login_user_id and r['user_id'] == login_user_id:
                 sheet['mine'] = True
             sheet['reserved'] = True
-            sheet['reserved_at'] = int(r['reserved_at'].replace(tzinfo=timezone.utc).timestamp())
+            sheet['reserved_at'] = r['reserved_at_us'] // 1000000
             event['sheets'][rank]['detail'].append(sheet)
             last_sheet_id = r['sheet_id']
 
@@ -229,12 +237,32 @@ def validate_rank(rank):
     return int(ret['total_sheets']) > 0
 
 
+def now_us():
+    return int(time.time() * 1000000)
+
+
+@functools.lru_cache(maxsize=4096)
+def format_epoch_date(days):
+    return (EPOCH + timedelta(days=days)).strftime('%Y-%m-%dT')
+
+
+def format_epoch_us(us):
+    if us is None:
+        return ''
+    days, seconds = divmod(us // 1000000, 86400)
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    return '%s%02d:%02d:%02dZ' % (format_epoch_date(days), hours, minutes, seconds)
+
+
 def render_report_csv(reports):
     keys = ["reservation_id", "event_id", "rank", "num", "price", "user_id", "sold_at", "canceled_at"]
 
     def generate():
         yield ','.join(keys) + '\n'
         for report in reports:
+            report['sold_at'] = format_epoch_us(report['sold_at'])
+            report['canceled_at'] = format_epoch_us(report['canceled_at'])
             yield ','.join([str(report[key]) for key in keys]) + '\n'
 
     headers = {}
@@ -258,6 +286,14 @@ def get_initialize():
     subprocess.call(["../../db/init.sh"])
     conn = dbh()
     cur = conn.cursor()
+    for column, source in RESERVATION_EPOCH_COLUMNS:
+        cur.execute(
+            "SELECT COUNT(*) AS found FROM information_schema.COLUMNS WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'reservations' AND COLUMN_NAME = %s",
+            [column])
+        if cur.fetchone()['found']:
+            continue
+        cur.execute(
+            "ALTER TABLE reservations ADD COLUMN {} BIGINT AS (TIMESTAMPDIFF(MICROSECOND, '1970-01-01 00:00:00', {})) VIRTUAL".format(column, source))
     cur.execute('''
     CREATE TABLE IF NOT EXISTS sheet_reserved (
         id          INTEGER UNSIGNED PRIMARY KEY AUTO_INCREMENT,
@@ -325,7 +361,7 @@ def get_users(user_id):
         return ('', 403)
 
     cur.execute(
-        "SELECT r.*, s.rank AS sheet_rank, s.num AS sheet_num FROM reservations r INNER JOIN sheets s ON s.id = r.sheet_id WHERE r.user_id = %s ORDER BY IFNULL(r.canceled_at, r.reserved_at) DESC LIMIT 5",
+        "SELECT r.id, r.event_id, r.reserved_at_us, r.canceled_at_us, s.rank AS sheet_rank, s.num AS sheet_num FROM reservations r INNER JOIN sheets s ON s.id = r.sheet_id WHERE r.user_id = %s ORDER BY IFNULL(r.canceled_at, r.reserved_at) DESC LIMIT 5",
         [user['id']])
     recent_reservations = []
     for row in cur.fetchall():
@@ -335,8 +371,8 @@ def get_users(user_id):
         del event['total']
         del event['remains']
 
-        if row['canceled_at']:
-            canceled_at = int(row['canceled_at'].replace(tzinfo=timezone.utc).timestamp())
+        if row['canceled_at_us'] is not None:
+            canceled_at = row['canceled_at_us'] // 1000000
         else:
             canceled_at = None
 
@@ -346,7 +382,7 @@ def get_users(user_id):
             "sheet_rank": row['sheet_rank'],
             "sheet_num": int(row['sheet_num']),
             "price": int(price),
-            "reserved_at": int(row['reserved_at'].replace(tzinfo=timezone.utc).timestamp()),
+            "reserved_at": row['reserved_at_us'] // 1000000,
             "canceled_at": canceled_at,
         })
 
@@ -449,8 +485,8 @@ def post_reserve(event_id):
             conn.autocommit(False)
             cur = conn.cursor()
             cur.execute(
-                "INSERT INTO reservations (event_id, sheet_id, user_id, reserved_at) VALUES (%s, %s, %s, %s)",
-                [event['id'], sheet['id'], user['id'], datetime.utcnow().strftime("%F %T.%f")])
+                "INSERT INTO reservations (event_id, sheet_id, user_id, reserved_at) VALUES (%s, %s, %s, TIMESTAMPADD(MICROSECOND, %s, '1970-01-01 00:00:00'))",
+                [event['id'], sheet['id'], user['id'], now_us()])
             reservation_id = cur.lastrowid
             sql = '''
             UPDATE sheet_reserved SET reserved = reserved + 1
@@ -504,8 +540,8 @@ def delete_reserve(event_id, rank, num):
             return res_error("not_permitted", 403)
 
         cur.execute(
-            "UPDATE reservations SET canceled_at = %s WHERE id = %s",
-            [datetime.utcnow().strftime("%F %T.%f"), reservation['id']])
+            "UPDATE reservations SET canceled_at = TIMESTAMPADD(MICROSECOND, %s, '1970-01-01 00:00:00') WHERE id = %s",
+            [now_us(), reservation['id']])
         sql = '''
         UPDATE sheet_reserved SET reserved = reserved - 1
         WHERE event_id = %s AND `rank` = %s
@@ -636,8 +672,8 @@ def get_admin_event_sales(event_id):
             s.num AS num,
             s.price + e.price AS price,
             r.user_id AS user_id,
-            DATE_FORMAT(r.reserved_at, '%%Y-%%m-%%dT%%TZ') AS sold_at,
-            IFNULL(DATE_FORMAT(r.canceled_at, '%%Y-%%m-%%dT%%TZ'), '') AS canceled_at
+            r.reserved_at_us AS sold_at,
+            r.canceled_at_us AS canceled_at
         FROM reservations r
         INNER JOIN sheets s ON s.id = r.sheet_id
         INNER JOIN events e ON e.id = r.event_id
@@ -660,8 +696,8 @@ def get_admin_sales():
             s.num AS num,
             s.price + e.price AS price,
             r.user_id AS user_id,
-            DATE_FORMAT(r.reserved_at, '%Y-%m-%dT%TZ') AS sold_at,
-            IFNULL(DATE_FORMAT(r.canceled_at, '%Y-%m-%dT%TZ'), '') AS canceled_at
+            r.reserved_at_us AS sold_at,
+            r.canceled_at_us AS canceled_at
         FROM reservations r
         INNER JOIN sheets s ON s.id = r.sheet_id
         INNER JOIN events e ON e.id = r.event_id
@@ -0,0 +1,69 @@
+import random
+import timeit
+from datetime import datetime, timedelta, timezone
+
+
+def convert(sheet_id):
+    if sheet_id <= 50:
+        return ('S', sheet_id)
+    if sheet_id <= 200:
+        return ('A', sheet_id - 50)
+    if sheet_id <= 500:
+        return ('B', sheet_id - 200)
+    return ('C', sheet_id - 500)
+
+
+def build_detail(rows, login_user_id, reserved_at):
+    detail = {'S': [], 'A': [], 'B': [], 'C': []}
+    last_sheet_id = 0
+    for r in rows:
+        for sheet_id in range(last_sheet_id + 1, r['sheet_id']):
+            rank, num = convert(sheet_id)
+            detail[rank].append({'num': num})
+
+        rank, num = convert(r['sheet_id'])
+        sheet = {'num': num}
+        if login_user_id and r['user_id'] == login_user_id:
+            sheet['mine'] = True
+        sheet['reserved'] = True
+        sheet['reserved_at'] = reserved_at(r)
+        detail[rank].append(sheet)
+        last_sheet_id = r['sheet_id']
+
+    for sheet_id in range(last_sheet_id + 1, 1001):
+        rank, num = convert(sheet_id)
+        detail[rank].append({'num': num})
+    return detail
+
+
+def before(r):
+    return int(r['reserved_at'].replace(tzinfo=timezone.utc).timestamp())
+
+
+def after(r):
+    return r['reserved_at_us'] // 1000000
+
+
+def make_rows(n):
+    base = datetime(2018, 9, 8, 10, 0, 0)
+    rows = []
+    for sheet_id in sorted(random.sample(range(1, 1001), n)):
+        reserved_at = base + timedelta(microseconds=random.randrange(10 ** 12))
+        reserved_at_us = (reserved_at - datetime(1970, 1, 1)) // timedelta(microseconds=1)
+        rows.append({
+            'sheet_id': sheet_id,
+            'user_id': random.randrange(1, 100),
+            'reserved_at': reserved_at,
+            'reserved_at_us': reserved_at_us,
+        })
+    return rows
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    for n in [100, 500, 1000]:
+        rows = make_rows(n)
+        assert build_detail(rows, 1, before) == build_detail(rows, 1, after)
+        for name, reserved_at in [('before', before), ('after', after)]:
+            t = min(timeit.repeat(lambda: build_detail(rows, 1, reserved_at), number=200, repeat=5))
+            print('{:4d} reserved  {:6s}  {:.1f} us/call'.format(n, name, t / 200 * 1e6))